@@ -1,9 +1,476 @@
 import json
 import numpy as np
 from PIL import Image
-from io import BytesIO
+from io import BytesIO, StringIO
 import base64
+import copy
+import math
 import os
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
+from types import MappingProxyType
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:  # numba is optional, kernels then run as plain Python
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, stdlib json is used instead
+    orjson = None
+
+
+# Action types accepted by the drawing UI
+_VALID_ACTIONS = frozenset({"moveTo", "click", "mouseDown", "mouseUp"})
+# Action types that must carry x/y coordinates
+_COORD_REQUIRING = frozenset({"moveTo"})
+# Sentinel for a missing dict key
+_MISSING = object()
+# Above this many points, _match_buttons loops over centers instead of broadcasting
+_BROADCAST_MATCH_LIMIT = 512
+
+# Decimals the coverage estimates are rounded to
+COVERAGE_DECIMALS = 4
+
+# Spatial accuracy below this is classified as incorrect placement. Accuracy is
+# 1 - (Euclidean distance / canvas diagonal), so the threshold is on that linear scale
+SPATIAL_ACCURACY_THRESHOLD = 0.7
+
+# Region keywords in priority order - the first region with a phrase in the
+# prompt wins (so "top-left" beats "top" and "left")
+_REGION_PHRASES = (
+    ("top-left", ("top-left", "upper-left", "top left")),
+    ("top-right", ("top-right", "upper-right", "top right")),
+    ("bottom-left", ("bottom-left", "lower-left", "bottom left")),
+    ("bottom-right", ("bottom-right", "lower-right", "bottom right")),
+    ("center", ("center", "middle", "centre")),
+    ("top", ("top", "upper")),
+    ("bottom", ("bottom", "lower")),
+    ("left", ("left",)),
+    ("right", ("right",)),
+)
+_REGION_RANK = {phrase: rank for rank, (_, phrases) in enumerate(_REGION_PHRASES) for phrase in phrases}
+# Zero-width lookahead so overlapping phrases (e.g. "left" in "leftop") are all found;
+# at a given position the higher-priority phrase is tried first
+_REGION_RE = re.compile("(?=(" + "|".join(re.escape(phrase) for phrase in _REGION_RANK) + "))")
+
+# Integer action codes used by the SoA kernels
+ACTION_CODES = {"moveTo": 0, "click": 1, "mouseDown": 2, "mouseUp": 3, "unknown": 4}
+_MOVE_TO = ACTION_CODES["moveTo"]
+_CLICK = ACTION_CODES["click"]
+_MOUSE_DOWN = ACTION_CODES["mouseDown"]
+_MOUSE_UP = ACTION_CODES["mouseUp"]
+_UNKNOWN = ACTION_CODES["unknown"]
+
+# Shape tool ids understood by _fill_shape_jit
+SHAPE_TOOL_IDS = {"rectangle": 0, "circle": 1, "line": 2}
+# Freehand tools (pen, eraser) mark every point visited while drawing
+FREEHAND_TOOL_ID = 3
+FREEHAND_TOOLS = ("pen", "eraser")
+# Any other tool (e.g. fill) doesn't contribute to coverage
+OTHER_TOOL_ID = -1
+
+# Angular samples used to sweep circles
+_CIRCLE_COS = np.cos(np.linspace(0, 2 * np.pi, 50))
+_CIRCLE_SIN = np.sin(np.linspace(0, 2 * np.pi, 50))
+
+
+def _as_float_array(values):
+    """Convert values to a float64 array, mapping non-numeric entries to NaN"""
+    try:
+        array = np.array(values, dtype=np.float64)
+        # Sequences as values would add a dimension instead of failing
+        if array.ndim == 1:
+            return array
+    except (ValueError, TypeError, OverflowError):
+        pass
+
+    converted = []
+    for value in values:
+        if type(value) is float:
+            converted.append(value)
+            continue
+        try:
+            converted.append(float(value))
+        except (ValueError, TypeError, OverflowError):
+            converted.append(np.nan)
+    return np.array(converted, dtype=np.float64)
+
+
+@dataclass
+class ActionArray:
+    """
+    Typed per-action columns (one entry per action), built once per trace
+    with ActionArray.from_dicts and shared by the metrics
+    """
+    kinds: np.ndarray       # int8 ACTION_CODES
+    xs: np.ndarray          # float64, NaN where missing or non-numeric
+    ys: np.ndarray
+    pointer_xs: np.ndarray  # float64 for button matching, 0 where the key is missing
+    pointer_ys: np.ndarray
+    has_x: np.ndarray       # bool, "x" key present
+    has_y: np.ndarray       # bool, "y" key present
+    has_xy: np.ndarray      # bool, x and y both set (not None)
+    is_drawing: np.ndarray  # bool, between a mouseDown (inclusive) and the next mouseUp
+    on_canvas: np.ndarray   # bool, position inside the canvas (edges included)
+    colors: np.ndarray      # intp palette index of the color button under the pointer, -1 if none
+
+    @classmethod
+    def from_dicts(cls, actions, canvas, color_index, kinds=None):
+        """
+        Convert a list of action dicts into parallel NumPy columns
+        canvas: (offset_x, offset_y, width, height)
+        color_index: maps pointer (xs, ys) to palette indices, -1 for no color
+        kinds: precomputed list of action types, if any
+        """
+        if kinds is None:
+            kinds = [action.get("action") for action in actions]
+
+        nan = np.nan
+        xs = _as_float_array([action.get("x", nan) for action in actions])
+        ys = _as_float_array([action.get("y", nan) for action in actions])
+        codes = np.array([ACTION_CODES.get(kind, _UNKNOWN) for kind in kinds], dtype=np.int8).reshape(-1)
+        has_x = np.fromiter(("x" in action for action in actions), dtype=bool, count=len(actions))
+        has_y = np.fromiter(("y" in action for action in actions), dtype=bool, count=len(actions))
+        has_xy = np.fromiter(
+            (action.get("x") is not None and action.get("y") is not None for action in actions),
+            dtype=bool, count=len(actions)
+        )
+        pointer_xs = np.where(has_x, xs, 0.0)
+        pointer_ys = np.where(has_y, ys, 0.0)
+
+        # Drawing state after each action: whether the latest mouseDown/mouseUp was a mouseDown
+        down = codes == _MOUSE_DOWN
+        last_event = np.maximum.accumulate(np.where(down | (codes == _MOUSE_UP), np.arange(len(codes)), -1))
+        is_drawing = (last_event >= 0) & down[np.maximum(last_event, 0)]
+
+        offx, offy, cw, ch = canvas
+        canvas_x = xs - offx
+        canvas_y = ys - offy
+        on_canvas = (0 <= canvas_x) & (canvas_x <= cw) & (0 <= canvas_y) & (canvas_y <= ch)
+
+        return cls(codes, xs, ys, pointer_xs, pointer_ys, has_x, has_y, has_xy,
+                   is_drawing, on_canvas, color_index(pointer_xs, pointer_ys))
+
+
+@njit(cache=True)
+def _grid_index(value, extent, grid_size):
+    """Map a canvas coordinate onto a grid cell index (not clamped below 0)"""
+    # Clamp before the int cast so huge coordinates cannot overflow
+    scaled = min(max((value / extent) * grid_size, -1.0), float(grid_size))
+    return int(scaled)
+
+
+@njit(cache=True, boundscheck=False)
+def _fill_shape_jit(grid, grid_size, tool_id, cx1, cy1, cx2, cy2, cw, ch):
+    """Fill grid cells for a shape given in canvas coordinates (tool ids: SHAPE_TOOL_IDS)"""
+    if tool_id == 0:
+        # Fill all cells in rectangle area
+        min_gx = max(0, _grid_index(min(cx1, cx2), cw, grid_size))
+        max_gx = min(grid_size - 1, _grid_index(max(cx1, cx2), cw, grid_size))
+        min_gy = max(0, _grid_index(min(cy1, cy2), ch, grid_size))
+        max_gy = min(grid_size - 1, _grid_index(max(cy1, cy2), ch, grid_size))
+
+        for gy in range(min_gy, max_gy + 1):
+            for gx in range(min_gx, max_gx + 1):
+                grid[gy, gx] = 1
+
+    elif tool_id == 1:
+        # Sweep radial samples along each angle of the circle
+        radius = np.sqrt((cx2 - cx1) ** 2 + (cy2 - cy1) ** 2)
+        n_radii = int(radius / 20) + 1
+        step = radius / (n_radii - 1) if n_radii > 1 else 0.0
+
+        for a in range(_CIRCLE_COS.shape[0]):
+            for k in range(n_radii):
+                r = radius if k == n_radii - 1 and n_radii > 1 else k * step
+                x = cx1 + r * _CIRCLE_COS[a]
+                y = cy1 + r * _CIRCLE_SIN[a]
+                if 0 <= x <= cw and 0 <= y <= ch:
+                    gx = min(_grid_index(x, cw, grid_size), grid_size - 1)
+                    gy = min(_grid_index(y, ch, grid_size), grid_size - 1)
+                    grid[gy, gx] = 1
+
+    elif tool_id == 2:
+        # Draw line with thickness
+        steps = int(max(abs(cx2 - cx1), abs(cy2 - cy1))) + 1
+        for i in range(steps):
+            t = i / max(steps - 1, 1)
+            x = cx1 + t * (cx2 - cx1)
+            y = cy1 + t * (cy2 - cy1)
+            if 0 <= x <= cw and 0 <= y <= ch:
+                gx = min(_grid_index(x, cw, grid_size), grid_size - 1)
+                gy = min(_grid_index(y, ch, grid_size), grid_size - 1)
+                grid[gy, gx] = 1
+
+
+@njit(cache=True)
+def _coverage_kernel(xs, ys, kinds, tool_xy, tool_ids, offx, offy, cw, ch, grid, freehand):
+    """
+    Replay the drawing state machine over SoA actions
+    Shapes are rasterized into the (zeroed) square grid; actions drawn with
+    pen/eraser are flagged in freehand so the caller can bin them in bulk
+    """
+    grid_size = grid.shape[0]
+    n = kinds.shape[0]
+
+    is_drawing = False
+    current_tool = FREEHAND_TOOL_ID  # Default tool is the pen
+    down_x = down_y = 0.0
+    last_x = last_y = 0.0  # Track last known position
+
+    for i in range(n):
+        kind = kinds[i]
+        x = xs[i]
+        y = ys[i]
+        has_xy = not (np.isnan(x) or np.isnan(y))
+
+        # Update last position if action has coordinates
+        if has_xy:
+            last_x = x
+            last_y = y
+
+        # Track tool selection
+        if kind == _CLICK and has_xy:
+            for t in range(tool_xy.shape[0]):
+                if abs(x - tool_xy[t, 0]) < 40 and abs(y - tool_xy[t, 1]) < 40:
+                    current_tool = tool_ids[t]
+                    break
+        elif kind == _MOVE_TO:
+            mx = 0.0 if np.isnan(x) else x
+            my = 0.0 if np.isnan(y) else y
+            for t in range(tool_xy.shape[0]):
+                if abs(mx - tool_xy[t, 0]) < 40 and abs(my - tool_xy[t, 1]) < 40:
+                    if i + 1 < n and kinds[i + 1] == _CLICK:
+                        current_tool = tool_ids[t]
+                    break
+
+        if kind == _MOUSE_DOWN:
+            is_drawing = True
+            # Use action coordinates if available, otherwise use last known position
+            down_x = x if has_xy else last_x
+            down_y = y if has_xy else last_y
+        elif kind == _MOUSE_UP:
+            # Handle shape tools (rectangle, circle, line)
+            if is_drawing and 0 <= current_tool <= 2:
+                up_x = x if has_xy else last_x
+                up_y = y if has_xy else last_y
+                _fill_shape_jit(grid, grid_size, current_tool,
+                                down_x - offx, down_y - offy, up_x - offx, up_y - offy, cw, ch)
+            is_drawing = False
+
+        # For pen/eraser, track movement while drawing
+        freehand[i] = is_drawing and current_tool == FREEHAND_TOOL_ID and has_xy
+
+    return grid
+
+
+@njit(cache=True)
+def _centroid_kernel(kinds, xs, ys, has_xy, x_lo, y_lo, x_hi, y_hi):
+    """
+    Sum the pen positions at on-canvas mouseDown actions
+    kinds are ACTION_CODES; has_xy marks actions whose x and y are both set
+    Returns: (sum_x, sum_y, count)
+    """
+    sum_x = 0.0
+    sum_y = 0.0
+    count = 0
+    has_pos = False
+    cur_x = 0.0
+    cur_y = 0.0
+
+    for i in range(len(kinds)):
+        kind = kinds[i]
+        if kind == _MOVE_TO:
+            if has_xy[i]:
+                cur_x = xs[i]
+                cur_y = ys[i]
+                has_pos = True
+        elif kind == _MOUSE_DOWN and has_pos:
+            if x_lo <= cur_x < x_hi and y_lo <= cur_y < y_hi:
+                sum_x += cur_x
+                sum_y += cur_y
+                count += 1
+
+    return sum_x, sum_y, count
+
+
+def _ui_config_key(config_path):
+    """Cache key for a UI config file: (absolute path, modification time)"""
+    if not os.path.exists(config_path):
+        raise FileNotFoundError(f"UI config file not found: {config_path}")
+
+    path = os.path.abspath(config_path)
+    return path, os.path.getmtime(path)
+
+
+def _load_json(path):
+    """Parse a JSON file, with orjson when it is installed"""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            data = f.read()
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson is stricter than json (e.g. NaN literals) - let json decide
+            return json.loads(data)
+
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=8)
+def _read_ui_config(path, mtime):
+    """
+    Parse a UI config file; re-read only when the file changes
+    The result is shared - callers must copy it before handing it out
+    """
+    return _load_json(path)
+
+
+@lru_cache(maxsize=8)
+def _build_ui_tables(path, mtime):
+    """Build color/tool position tables (plain and as arrays) for a UI config file"""
+    ui_config = _read_ui_config(path, mtime)
+
+    # Build color positions from config
+    color_positions = []
+    for color_key, color_data in ui_config["colors"].items():
+        color_positions.append((
+            color_data["x"],
+            color_data["y"],
+            color_data["hex"]
+        ))
+
+    # Build tool positions from config
+    tool_positions = {}
+    for tool_key, tool_data in ui_config["tools"].items():
+        tool_positions[tool_key] = (tool_data["x"], tool_data["y"])
+
+    tool_names = tuple(tool_positions)
+    tables = {
+        # Shared by every evaluator for this file, hence read-only
+        # (evaluators expose copies of the plain positions)
+        "color_positions": tuple(color_positions),
+        "tool_positions": MappingProxyType(tool_positions),
+        "tool_names": tool_names,
+        # Button centers as (N, 2) arrays for vectorized position matching
+        "tool_xy": np.array(list(tool_positions.values()), dtype=np.float64).reshape(-1, 2),
+        "color_xy": np.array([(cx, cy) for cx, cy, _ in color_positions], dtype=np.float64).reshape(-1, 2),
+        "color_hex": tuple(color for _, _, color in color_positions),
+        # Color centers sorted by x (stable) for binary-search palette matching;
+        # color_order maps a sorted position back to its palette index
+        "color_order": np.argsort([cx for cx, _, _ in color_positions], kind="stable").astype(np.intp),
+        # Per-tool ids for the coverage kernel, in the same order as tool_xy
+        "tool_ids": np.array([
+            SHAPE_TOOL_IDS.get(name, FREEHAND_TOOL_ID if name in FREEHAND_TOOLS else OTHER_TOOL_ID)
+            for name in tool_names
+        ], dtype=np.int64),
+    }
+    tables["color_xs_sorted"] = tables["color_xy"][tables["color_order"], 0]
+    tables["color_ys_sorted"] = tables["color_xy"][tables["color_order"], 1]
+    for key in ("tool_xy", "color_xy", "tool_ids", "color_order", "color_xs_sorted", "color_ys_sorted"):
+        tables[key].flags.writeable = False
+
+    return tables
+
+
+@lru_cache(maxsize=4096)
+def _extract_region(prompt_lower):
+    """Canonical region named in a lowercased prompt, or None"""
+    best = len(_REGION_PHRASES)
+    for match in _REGION_RE.finditer(prompt_lower):
+        best = min(best, _REGION_RANK[match.group(1)])
+        if best == 0:
+            break
+
+    if best == len(_REGION_PHRASES):
+        return None
+    return _REGION_PHRASES[best][0]
+
+
+def _color_key(color):
+    """Canonical form of a color for comparisons (hex codes are case-insensitive)"""
+    return color.lower() if isinstance(color, str) else color
+
+
+@lru_cache(maxsize=256)
+def _actually_used_checks(criteria_keys):
+    """(key, tool name) for each '..._actually_used' key among criteria_met keys"""
+    return tuple(
+        (key, key.replace('tool_', '').replace('_actually_used', ''))
+        for key in criteria_keys if key.endswith('_actually_used')
+    )
+
+
+@lru_cache(maxsize=256)
+def _compile_scoring_plan(criteria_keys):
+    """
+    Turn the keys of a criteria_met dict into the list of score penalties to apply
+    The keys only depend on the evaluation criteria, so the plan is shared across
+    every trace scored against the same criteria
+    Returns: tuple of opcodes, e.g. ('tool_penalty', keys, 0.15)
+    """
+    present = frozenset(criteria_keys)
+    plan = []
+
+    # Prefer "actually_used" over just "used" - a plain "used" check only
+    # counts when there's no "actually_used" check for that tool
+    actually_used = {key for key, _ in _actually_used_checks(criteria_keys)}
+    tool_keys = []
+    for key in criteria_keys:
+        if key in actually_used:
+            tool_keys.append(key)
+        elif key.startswith('tool_') and key.endswith('_used'):
+            tool_name = key.replace('tool_', '').replace('_used', '')
+            if f'tool_{tool_name}_actually_used' not in present:
+                tool_keys.append(key)
+    plan.append(('tool_penalty', tuple(tool_keys), 0.15))  # Reduced from 0.20 to prevent score saturation
+
+    # Use exact color matching if available (penalty per missing color)
+    if 'min_colors_exact_met' in present:
+        plan.append(('exact_color_penalty', 0.05))  # Reduced from 0.08 to prevent score saturation
+    elif 'min_colors_met' in present:
+        plan.append(('color_penalty', 0.05))
+
+    if 'min_segments_met' in present:
+        plan.append(('segment_penalty', 0.15))
+
+    # Coverage: proportional to the deficit when the accurate check is available
+    if 'min_coverage_accurate_met' in present:
+        plan.append(('proportional_coverage', 0.12))
+    elif 'min_coverage_met' in present:
+        plan.append(('coverage_penalty', 0.12))
+
+    return tuple(plan)
+
+
+@lru_cache(maxsize=None)
+def _warm_up_kernels():
+    """Compile the JIT kernels once so the first evaluation doesn't pay for it"""
+    # Button tables are read-only arrays, which Numba types separately
+    tool_xy = np.zeros((1, 2))
+    tool_ids = np.zeros(1, dtype=np.int64)
+    tool_xy.flags.writeable = False
+    tool_ids.flags.writeable = False
+
+    _fill_shape_jit(np.zeros((2, 2), dtype=np.uint8), 2, 0, 0.0, 0.0, 1.0, 1.0, 1.0, 1.0)
+    _coverage_kernel(np.zeros(1), np.zeros(1), np.zeros(1, dtype=np.int8),
+                     tool_xy, tool_ids, 0.0, 0.0, 1.0, 1.0, np.zeros((2, 2), dtype=np.uint8),
+                     np.zeros(1, dtype=np.bool_))
+    _centroid_kernel(np.zeros(1, dtype=np.int8), np.zeros(1), np.zeros(1),
+                     np.zeros(1, dtype=np.bool_), 0.0, 0.0, 1.0, 1.0)
 
 
 class DrawingEvaluator:
@@ -21,30 +488,56 @@ class DrawingEvaluator:
         self.canvas_offset_x = self.ui_config["canvas"]["offset_x"]
         self.canvas_offset_y = self.ui_config["canvas"]["offset_y"]
 
-        # Build color positions from config
-        self.color_positions = []
-        for color_key, color_data in self.ui_config["colors"].items():
-            self.color_positions.append((
-                color_data["x"],
-                color_data["y"],
-                color_data["hex"]
-            ))
-
-        # Build tool positions from config
-        self.tool_positions = {}
-        for tool_key, tool_data in self.ui_config["tools"].items():
-            self.tool_positions[tool_key] = (tool_data["x"], tool_data["y"])
+        # The array forms of the color/tool positions are shared by all
+        # evaluators built from the same config file - they are read-only
+        tables = self._load_ui_tables(config_path)
+        self.color_positions = list(tables["color_positions"])
+        self.tool_positions = dict(tables["tool_positions"])
+        self._tool_names = tables["tool_names"]
+        self._tool_xy = tables["tool_xy"]
+        self._tool_ids = tables["tool_ids"]
+        self._color_hex = tables["color_hex"]
+        self._color_order = tables["color_order"]
+        self._color_xs_sorted = tables["color_xs_sorted"]
+        self._color_ys_sorted = tables["color_ys_sorted"]
+
+        # Canvas invariants used by the spatial metrics
+        self._canvas = (self.canvas_offset_x, self.canvas_offset_y, self.canvas_width, self.canvas_height)
+        self._cx_hi = self.canvas_offset_x + self.canvas_width
+        self._cy_hi = self.canvas_offset_y + self.canvas_height
+        # Maximum possible distance (canvas diagonal)
+        self._max_distance = math.hypot(self.canvas_width, self.canvas_height)
+        self._region_centers = self._build_region_centers()
 
         # Tolerance for position matching
         self.tolerance = self.ui_config["tolerance"]
 
-    def _load_ui_config(self, config_path):
-        """Load UI configuration from JSON file"""
-        if not os.path.exists(config_path):
-            raise FileNotFoundError(f"UI config file not found: {config_path}")
+        # Mutable scratch state is kept per thread (see _scratch), so one
+        # evaluator can be shared by concurrently running batch tests
+        self._local = threading.local()
+
+        _warm_up_kernels()
 
-        with open(config_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+    def _scratch(self):
+        """
+        This thread's scratch state, created on first use:
+        grid_buf - coverage grid reused across calls (20x20 grid = 400 cells)
+        """
+        local = self._local
+        if not hasattr(local, "grid_buf"):
+            local.grid_buf = np.zeros((20, 20), dtype=np.uint8)
+        return local
+
+    @classmethod
+    def _load_ui_config(cls, config_path):
+        """Load UI configuration from JSON file (parsed once per file version)"""
+        # Each evaluator gets its own copy of the shared parse
+        return copy.deepcopy(_read_ui_config(*_ui_config_key(config_path)))
+
+    @classmethod
+    def _load_ui_tables(cls, config_path):
+        """Load position tables derived from the UI configuration"""
+        return _build_ui_tables(*_ui_config_key(config_path))
 
     def evaluate(self, actions, ground_truth=None, criteria=None):
         """
@@ -80,51 +573,58 @@ class DrawingEvaluator:
                 "score": 0.0
             }
 
+        # Criteria-independent analysis, memoized per actions list
+        analysis = self._analyze_actions(actions)
+        stats = analysis["stats"]
+
         results = {
             "total_actions": len(actions),
-            "action_breakdown": self._count_actions(actions),
+            "action_breakdown": dict(stats["counts"]),
             "errors": [],
             "warnings": [],
             "metrics": {}
         }
 
         # Run various evaluations
-        results["errors"].extend(self._check_syntax_errors(actions))
-        results["errors"].extend(self._check_coordinate_errors(actions))
-        results["warnings"].extend(self._check_efficiency_warnings(actions))
+        results["errors"].extend(analysis["syntax_errors"])
+        results["errors"].extend(analysis["coordinate_errors"])
+        results["warnings"].extend(analysis["warnings"])
 
         # Analyze action patterns
-        results["metrics"]["tool_changes"] = self._count_tool_changes(actions)
-        results["metrics"]["color_changes"] = self._count_color_changes(actions)
-        results["metrics"]["drawing_segments"] = self._count_drawing_segments(actions)
-        results["metrics"]["canvas_coverage"] = self._estimate_canvas_coverage(actions)
+        metrics = results["metrics"]
+        metrics["tool_changes"] = stats["tool_clicks"]
+        metrics["color_changes"] = stats["color_clicks"]
+        metrics["drawing_segments"] = stats["segments"]
+        metrics["canvas_coverage"] = analysis["canvas_coverage"]
 
         # ENHANCED: Additional accurate metrics
-        results["metrics"]["canvas_coverage_accurate"] = self._estimate_canvas_coverage_accurate(actions)
-        results["metrics"]["exact_colors_used"] = self._detect_exact_colors_used(actions)
+        metrics["canvas_coverage_accurate"] = analysis["canvas_coverage_accurate"]
+        metrics["exact_colors_used"] = list(analysis["exact_colors_used"])
 
         # ENHANCED: Spatial accuracy metric
         if criteria and "prompt" in criteria:
             spatial_constraints = self._extract_spatial_constraints(criteria["prompt"])
             if spatial_constraints:
-                results["metrics"]["spatial_accuracy"] = self._evaluate_spatial_accuracy(actions, spatial_constraints)
-                results["metrics"]["spatial_constraints"] = spatial_constraints
+                metrics["spatial_accuracy"] = self._evaluate_spatial_accuracy(actions, spatial_constraints, columns=analysis["columns"])
+                metrics["spatial_constraints"] = spatial_constraints
             else:
-                results["metrics"]["spatial_accuracy"] = None
-                results["metrics"]["spatial_constraints"] = {}
+                metrics["spatial_accuracy"] = None
+                metrics["spatial_constraints"] = {}
         else:
-            results["metrics"]["spatial_accuracy"] = None
-            results["metrics"]["spatial_constraints"] = {}
+            metrics["spatial_accuracy"] = None
+            metrics["spatial_constraints"] = {}
 
         # ENHANCED: Action efficiency metric
         if criteria:
-            results["metrics"]["action_efficiency"] = self._calculate_action_efficiency(actions, criteria)
+            metrics["action_efficiency"] = self._calculate_action_efficiency(actions, criteria)
         else:
-            results["metrics"]["action_efficiency"] = None
+            metrics["action_efficiency"] = None
 
         # Check for required actions
         if criteria:
-            results["criteria_met"] = self._check_criteria(actions, criteria)
+            results["criteria_met"] = self._check_criteria(
+                actions, criteria, stats, metrics, analysis["exact_color_keys"], analysis["columns"]
+            )
             # Store required color count for scoring
             if "required_colors" in criteria:
                 results["colors_required"] = len(criteria["required_colors"])
@@ -137,7 +637,7 @@ class DrawingEvaluator:
 
         # ENHANCED: Classify errors for detailed analysis
         if criteria:
-            results["error_classification"] = self._classify_errors(results, criteria)
+            results["error_classification"] = self._classify_errors(results, criteria, analysis["exact_color_keys"])
         else:
             results["error_classification"] = {
                 'spatial_errors': [],
@@ -149,32 +649,110 @@ class DrawingEvaluator:
 
         return results
 
-    def _count_actions(self, actions):
-        """Count different types of actions"""
-        counts = {
-            "moveTo": 0,
-            "click": 0,
-            "mouseDown": 0,
-            "mouseUp": 0,
-            "unknown": 0
+    def _analyze_actions(self, actions):
+        """Run the criteria-independent analyzers over an actions list"""
+        stats = self._single_pass_stats(actions)
+        # Action kinds are read once and shared by every analyzer below,
+        # as are the per-action columns for the canvas metrics
+        kinds = stats["kinds"]
+        columns = self._action_array(actions, kinds)
+
+        # Both coverage estimates only count points after a mouseDown,
+        # so a trace without drawing segments covers nothing
+        if stats["segments"] == 0:
+            canvas_coverage = 0.0
+            canvas_coverage_accurate = 0.0
+        else:
+            canvas_coverage = self._estimate_canvas_coverage(actions, columns=columns)
+            canvas_coverage_accurate = self._estimate_canvas_coverage_accurate(actions, columns=columns)
+
+        analysis = {
+            "stats": stats,
+            "columns": columns,
+            "syntax_errors": self._check_syntax_errors(actions),
+            "coordinate_errors": self._check_coordinate_errors(actions, columns=columns),
+            "warnings": self._check_efficiency_warnings(actions, stats),
+            "canvas_coverage": canvas_coverage,
+            "canvas_coverage_accurate": canvas_coverage_accurate,
+            "exact_colors_used": self._detect_exact_colors_used(actions, columns=columns)
         }
+        # Canonical used colors, matched against each criteria's required colors
+        analysis["exact_color_keys"] = frozenset(_color_key(color) for color in analysis["exact_colors_used"])
+
+        return analysis
+
+    def _single_pass_stats(self, actions):
+        """
+        Gather action counters in a single traversal
+        Returns: Dictionary with counts, down_count, up_count, segments,
+        tool_clicks, color_clicks and the per-action kinds
+        """
+        kinds = []
+        click_xs = []
+        click_ys = []
+        segments = 0
+        in_segment = False
+
+        # Bound methods as locals for the loop
+        add_kind = kinds.append
+        add_click_x = click_xs.append
+        add_click_y = click_ys.append
 
         for action in actions:
-            action_type = action.get("action", "unknown")
-            if action_type in counts:
-                counts[action_type] += 1
-            else:
-                counts["unknown"] += 1
+            action_type = action.get("action")
+            add_kind(action_type)
+
+            # Count continuous drawing segments
+            if action_type == "mouseDown":
+                if not in_segment:
+                    segments += 1
+                    in_segment = True
+            elif action_type == "mouseUp":
+                in_segment = False
+            elif action_type == "click":
+                add_click_x(action.get("x", 0))
+                add_click_y(action.get("y", 0))
+
+        # Anything that isn't a known action type (including a missing one) is "unknown"
+        type_counts = Counter(kinds)
+        counts = {k: type_counts.get(k, 0) for k in ("moveTo", "click", "mouseDown", "mouseUp")}
+        counts["unknown"] = len(kinds) - sum(counts.values())
+
+        xs = _as_float_array(click_xs)
+        ys = _as_float_array(click_ys)
+
+        # Clicks near any tool button (moveTo + click is counted by the click itself)
+        tool_matched, _ = self._match_buttons(xs, ys, self._tool_xy, 40, 40, strict=True)
+
+        # Clicks inside the color palette row
+        color_y = 25
+        color_x_range = (405, 741)
+        color_matched = ((color_x_range[0] <= xs) & (xs <= color_x_range[1]) &
+                         (np.abs(ys - color_y) < 20))
+
+        return {
+            "counts": counts,
+            "down_count": counts["mouseDown"],
+            "up_count": counts["mouseUp"],
+            "segments": segments,
+            "tool_clicks": int(np.count_nonzero(tool_matched)),
+            "color_clicks": int(np.count_nonzero(color_matched)),
+            "kinds": kinds
+        }
 
-        return counts
+    def _count_actions(self, actions):
+        """Count different types of actions"""
+        return self._single_pass_stats(actions)["counts"]
 
     def _check_syntax_errors(self, actions):
         """Check for syntax/format errors in actions"""
         errors = []
 
         for i, action in enumerate(actions):
+            action_type = action.get("action", _MISSING)
+
             # Check if action field exists
-            if "action" not in action:
+            if action_type is _MISSING:
                 errors.append({
                     "type": "SYNTAX_ERROR",
                     "index": i,
@@ -182,10 +760,8 @@ class DrawingEvaluator:
                 })
                 continue
 
-            action_type = action["action"]
-
             # Check for required coordinates
-            if action_type in ["moveTo"]:
+            if action_type in _COORD_REQUIRING:
                 if "x" not in action or "y" not in action:
                     errors.append({
                         "type": "SYNTAX_ERROR",
@@ -194,8 +770,7 @@ class DrawingEvaluator:
                     })
 
             # Check for valid action types
-            valid_actions = ["moveTo", "click", "mouseDown", "mouseUp"]
-            if action_type not in valid_actions:
+            if action_type not in _VALID_ACTIONS:
                 errors.append({
                     "type": "SYNTAX_ERROR",
                     "index": i,
@@ -204,52 +779,155 @@ class DrawingEvaluator:
 
         return errors
 
-    def _check_coordinate_errors(self, actions):
-        """Check for coordinate boundary errors with detailed context"""
+    def _invalid_coords_mask(self, actions, columns):
+        """
+        Actions with both coordinates present where one isn't numeric
+        (float() fails); only the NaN entries of the columns are inspected
+        """
+        invalid = np.zeros(len(actions), dtype=bool)
+        suspect = columns.has_x & columns.has_y & (np.isnan(columns.xs) | np.isnan(columns.ys))
+        for i in np.flatnonzero(suspect):
+            action = actions[i]
+            try:
+                float(action["x"]), float(action["y"])
+            except (ValueError, TypeError):
+                invalid[i] = True
+        return invalid
+
+    def _action_array(self, actions, kinds=None):
+        """ActionArray for a list of action dicts (kinds: precomputed list of action types)"""
+        return ActionArray.from_dicts(actions, self._canvas, self._color_index, kinds)
+
+    def _match_buttons(self, xs, ys, centers, tol_x, tol_y, strict=False):
+        """
+        Match points against button centers within a tolerance box
+        Returns: (matched, idx) - idx is the first matching button per point
+        """
+        if len(centers) == 0:
+            return np.zeros(len(xs), dtype=bool), np.zeros(len(xs), dtype=np.intp)
+
+        within = np.less if strict else np.less_equal
+        if len(xs) <= _BROADCAST_MATCH_LIMIT:
+            # Short traces: a single broadcast has the least call overhead
+            hits = (within(np.abs(xs - centers[:, 0:1]), tol_x) &
+                    within(np.abs(ys - centers[:, 1:2]), tol_y))
+        else:
+            # Long traces: one contiguous pass over all points per (few) button
+            # centers avoids the large (T, A) float temporaries
+            hits = np.empty((len(centers), len(xs)), dtype=bool)
+            for t, (cx, cy) in enumerate(centers.tolist()):
+                np.logical_and(within(np.abs(xs - cx), tol_x), within(np.abs(ys - cy), tol_y), out=hits[t])
+
+        # hits is (T, A); argmax picks the first matching button per point
+        return hits.any(axis=0), hits.argmax(axis=0)
+
+    def _match_colors(self, xs, ys, tol_x, tol_y):
+        """
+        Match points against the color palette (inclusive tolerance box)
+        Binary-searches the x-sorted centers, so only the few colors inside
+        each point's x window are tested
+        Returns: (matched, idx) - idx is the first matching color per point
+        """
+        n_colors = len(self._color_order)
+        if n_colors == 0:
+            return np.zeros(len(xs), dtype=bool), np.zeros(len(xs), dtype=np.intp)
+
+        centers_x = self._color_xs_sorted
+        centers_y = self._color_ys_sorted
+        order = self._color_order
+
+        # Candidate window per point, padded by a pixel so that the exact
+        # tolerance test below decides the edges
+        lo = np.searchsorted(centers_x, xs - (tol_x + 1), side="left")
+        hi = np.searchsorted(centers_x, xs + (tol_x + 1), side="right")
+        width = int((hi - lo).max()) if len(xs) else 0
+
+        # Lowest palette index among the hits; n_colors means no match
+        idx = np.full(len(xs), n_colors, dtype=np.intp)
+        for k in range(width):
+            pos = lo + k
+            in_window = pos < hi
+            pos = np.minimum(pos, n_colors - 1)
+            hit = (in_window &
+                   (np.abs(xs - centers_x[pos]) <= tol_x) &
+                   (np.abs(ys - centers_y[pos]) <= tol_y))
+            np.minimum(idx, np.where(hit, order[pos], n_colors), out=idx)
+
+        matched = idx < n_colors
+        idx[~matched] = 0
+        return matched, idx
+
+    def _color_index(self, xs, ys):
+        """Palette index of the color button at each point, -1 where there is none"""
+        color_tolerance_x = 12
+        color_tolerance_y = 8  # Tighter Y tolerance since all color buttons at same Y
+
+        matched, idx = self._match_colors(xs, ys, color_tolerance_x, color_tolerance_y)
+        return np.where(matched, idx, -1)
+
+    def _check_coordinate_errors(self, actions, kinds=None, columns=None):
+        """
+        Check for coordinate boundary errors with detailed context
+        columns: precomputed ActionArray, if any
+        """
         errors = []
 
-        for i, action in enumerate(actions):
-            if "x" in action and "y" in action:
-                try:
-                    x, y = float(action["x"]), float(action["y"])
-                except (ValueError, TypeError):
-                    # Invalid coordinate types
-                    errors.append({
-                        "type": "SYNTAX_ERROR",
-                        "index": i,
-                        "message": f"Invalid coordinate types at index {i}: x={action.get('x')}, y={action.get('y')}",
-                        "action_detail": f"{action.get('action')}"
-                    })
-                    continue
+        if columns is None:
+            columns = self._action_array(actions, kinds)
+        # Coordinates are only checked when both keys are present
+        both = columns.has_x & columns.has_y
+        xs = np.where(both, columns.xs, np.nan)
+        ys = np.where(both, columns.ys, np.nan)
+        invalid = self._invalid_coords_mask(actions, columns)
+
+        # Vectorized boundary checks - only flagged indices are visited below
+        # (NaN, i.e. missing or invalid, coordinates fail every comparison)
+        screen_bad = (xs < 0) | (xs > 1500) | (ys < 0) | (ys > 900)
+        canvas_x = xs - self.canvas_offset_x
+        canvas_y = ys - self.canvas_offset_y
+        md_mask = columns.kinds == _MOUSE_DOWN
+        canvas_bad = md_mask & ((canvas_x < 0) | (canvas_x > self.canvas_width) |
+                                (canvas_y < 0) | (canvas_y > self.canvas_height))
+
+        for i in np.flatnonzero(screen_bad | canvas_bad | invalid):
+            i = int(i)
+            action = actions[i]
 
-                # Check if coordinates are within screen bounds
-                if x < 0 or x > 1500 or y < 0 or y > 900:
-                    error_msg = self._build_coordinate_error_context(
-                        action, i, x, y, "screen_bounds", actions
-                    )
-                    errors.append({
-                        "type": "COORDINATE_ERROR",
-                        "index": i,
-                        "message": error_msg,
-                        "action_detail": f"{action.get('action')}(x={x}, y={y})"
-                    })
+            if invalid[i]:
+                # Invalid coordinate types
+                errors.append({
+                    "type": "SYNTAX_ERROR",
+                    "index": i,
+                    "message": f"Invalid coordinate types at index {i}: x={action.get('x')}, y={action.get('y')}",
+                    "action_detail": f"{action.get('action')}"
+                })
+                continue
+
+            x, y = float(xs[i]), float(ys[i])
+
+            # Check if coordinates are within screen bounds
+            if screen_bad[i]:
+                error_msg = self._build_coordinate_error_context(
+                    action, i, x, y, "screen_bounds", actions
+                )
+                errors.append({
+                    "type": "COORDINATE_ERROR",
+                    "index": i,
+                    "message": error_msg,
+                    "action_detail": f"{action.get('action')}(x={x}, y={y})"
+                })
 
-                # Warn if trying to draw outside canvas (only check mouseDown, not moveTo)
-                if action.get("action") == "mouseDown":
-                    canvas_x = x - self.canvas_offset_x
-                    canvas_y = y - self.canvas_offset_y
-
-                    if (canvas_x < 0 or canvas_x > self.canvas_width or
-                        canvas_y < 0 or canvas_y > self.canvas_height):
-                        error_msg = self._build_coordinate_error_context(
-                            action, i, x, y, "canvas_bounds", actions
-                        )
-                        errors.append({
-                            "type": "COORDINATE_ERROR",
-                            "index": i,
-                            "message": error_msg,
-                            "action_detail": f"mouseDown(x={x}, y={y})"
-                        })
+            # Warn if trying to draw outside canvas (only check mouseDown, not moveTo)
+            if canvas_bad[i]:
+                error_msg = self._build_coordinate_error_context(
+                    action, i, x, y, "canvas_bounds", actions
+                )
+                errors.append({
+                    "type": "COORDINATE_ERROR",
+                    "index": i,
+                    "message": error_msg,
+                    "action_detail": f"mouseDown(x={x}, y={y})"
+                })
 
         return errors
 
@@ -258,59 +936,57 @@ class DrawingEvaluator:
         action_type = action.get("action", "unknown")
 
         if error_type == "screen_bounds":
-            msg = f"Action at index {index}: {action_type}(x={x}, y={y}) - Coordinates out of screen bounds.\n"
+            parts = [f"Action at index {index}: {action_type}(x={x}, y={y}) - Coordinates out of screen bounds.\n"]
 
             if x < 0:
-                msg += f"  Problem: x={x} is negative\n"
-                msg += f"  Valid range: x must be >= 0\n"
-                msg += f"  Suggestion: Use x >= 0"
+                parts.append(f"  Problem: x={x} is negative\n")
+                parts.append(f"  Valid range: x must be >= 0\n")
+                parts.append(f"  Suggestion: Use x >= 0")
             elif x > 1500:
-                msg += f"  Problem: x={x} exceeds screen width\n"
-                msg += f"  Valid range: x must be <= 1090 (canvas right edge)\n"
-                msg += f"  Suggestion: For canvas drawing, use x <= 1090"
+                parts.append(f"  Problem: x={x} exceeds screen width\n")
+                parts.append(f"  Valid range: x must be <= 1090 (canvas right edge)\n")
+                parts.append(f"  Suggestion: For canvas drawing, use x <= 1090")
 
             if y < 0:
-                msg += f"  Problem: y={y} is negative\n"
-                msg += f"  Valid range: y must be >= 0\n"
-                msg += f"  Suggestion: Use y >= 0"
+                parts.append(f"  Problem: y={y} is negative\n")
+                parts.append(f"  Valid range: y must be >= 0\n")
+                parts.append(f"  Suggestion: Use y >= 0")
             elif y > 900:
-                msg += f"  Problem: y={y} exceeds screen height\n"
-                msg += f"  Valid range: y must be <= 770 (canvas bottom edge)\n"
-                msg += f"  Suggestion: For canvas drawing, use y <= 770"
+                parts.append(f"  Problem: y={y} exceeds screen height\n")
+                parts.append(f"  Valid range: y must be <= 770 (canvas bottom edge)\n")
+                parts.append(f"  Suggestion: For canvas drawing, use y <= 770")
 
         elif error_type == "canvas_bounds":
             canvas_x = x - self.canvas_offset_x
             canvas_y = y - self.canvas_offset_y
 
-            msg = f"Action at index {index}: {action_type}(x={x}, y={y}) - Drawing outside canvas area.\n"
-            msg += f"  Canvas area: x ∈ [{self.canvas_offset_x}, {self.canvas_offset_x + self.canvas_width}], "
-            msg += f"y ∈ [{self.canvas_offset_y}, {self.canvas_offset_y + self.canvas_height}]\n"
+            parts = [f"Action at index {index}: {action_type}(x={x}, y={y}) - Drawing outside canvas area.\n"]
+            parts.append(f"  Canvas area: x ∈ [{self.canvas_offset_x}, {self._cx_hi}], ")
+            parts.append(f"y ∈ [{self.canvas_offset_y}, {self._cy_hi}]\n")
 
             if canvas_x < 0:
-                msg += f"  Problem: x={x} is left of canvas (canvas starts at x={self.canvas_offset_x})\n"
-                msg += f"  Suggestion: Use x >= {self.canvas_offset_x}"
+                parts.append(f"  Problem: x={x} is left of canvas (canvas starts at x={self.canvas_offset_x})\n")
+                parts.append(f"  Suggestion: Use x >= {self.canvas_offset_x}")
             elif canvas_x > self.canvas_width:
-                msg += f"  Problem: x={x} is right of canvas (canvas ends at x={self.canvas_offset_x + self.canvas_width})\n"
-                msg += f"  Suggestion: Use x <= {self.canvas_offset_x + self.canvas_width}"
+                parts.append(f"  Problem: x={x} is right of canvas (canvas ends at x={self._cx_hi})\n")
+                parts.append(f"  Suggestion: Use x <= {self._cx_hi}")
 
             if canvas_y < 0:
-                msg += f"  Problem: y={y} is above canvas (canvas starts at y={self.canvas_offset_y})\n"
-                msg += f"  Suggestion: Use y >= {self.canvas_offset_y}"
+                parts.append(f"  Problem: y={y} is above canvas (canvas starts at y={self.canvas_offset_y})\n")
+                parts.append(f"  Suggestion: Use y >= {self.canvas_offset_y}")
             elif canvas_y > self.canvas_height:
-                msg += f"  Problem: y={y} is below canvas (canvas ends at y={self.canvas_offset_y + self.canvas_height})\n"
-                msg += f"  Suggestion: Use y <= {self.canvas_offset_y + self.canvas_height}"
+                parts.append(f"  Problem: y={y} is below canvas (canvas ends at y={self._cy_hi})\n")
+                parts.append(f"  Suggestion: Use y <= {self._cy_hi}")
 
         # Add action sequence context
-        msg += self._get_action_sequence_context(index, actions)
-
-        return msg
+        return "".join(parts) + self._get_action_sequence_context(index, actions)
 
     def _get_action_sequence_context(self, index, actions, context_range=2):
         """Get surrounding action sequence for error context"""
         start = max(0, index - context_range)
         end = min(len(actions), index + context_range + 1)
 
-        context = "\n  Action sequence:\n"
+        parts = ["\n  Action sequence:\n"]
         for i in range(start, end):
             action = actions[i]
             action_str = f"{action.get('action')}"
@@ -318,15 +994,18 @@ class DrawingEvaluator:
                 action_str += f"(x={action['x']}, y={action['y']})"
 
             if i == index:
-                context += f"    [{i}] {action_str} ← ERROR\n"
+                parts.append(f"    [{i}] {action_str} ← ERROR\n")
             else:
-                context += f"    [{i}] {action_str}\n"
+                parts.append(f"    [{i}] {action_str}\n")
 
-        return context
+        return "".join(parts)
 
-    def _check_efficiency_warnings(self, actions):
+    def _check_efficiency_warnings(self, actions, stats=None):
         """Check for inefficient action patterns"""
         warnings = []
+        if stats is None:
+            stats = self._single_pass_stats(actions)
+        kinds = stats["kinds"]
 
         # Check for too many actions
         if len(actions) > 1000:
@@ -335,20 +1014,21 @@ class DrawingEvaluator:
                 "message": f"Very high action count: {len(actions)} actions"
             })
 
-        # Check for redundant moveTo
-        for i in range(len(actions) - 1):
-            if (actions[i].get("action") == "moveTo" and
-                actions[i + 1].get("action") == "moveTo"):
-                if i + 2 < len(actions) and actions[i + 2].get("action") == "moveTo":
-                    warnings.append({
-                        "type": "EFFICIENCY_WARNING",
-                        "message": f"Multiple consecutive moveTo actions at index {i}"
-                    })
-                    break
+        # Check for redundant moveTo (three or more in a row)
+        triples = zip(kinds, islice(kinds, 1, None), islice(kinds, 2, None))
+        first_run = next(
+            (i for i, (a, b, c) in enumerate(triples) if a == b == c == "moveTo"),
+            None
+        )
+        if first_run is not None:
+            warnings.append({
+                "type": "EFFICIENCY_WARNING",
+                "message": f"Multiple consecutive moveTo actions at index {first_run}"
+            })
 
-        # Check for unmatched mouseDown/mouseUp
-        down_count = sum(1 for a in actions if a.get("action") == "mouseDown")
-        up_count = sum(1 for a in actions if a.get("action") == "mouseUp")
+        # Check for unmatched mouseDown/mouseUp (counted during the single pass)
+        down_count = stats["down_count"]
+        up_count = stats["up_count"]
 
         if down_count != up_count:
             warnings.append({
@@ -360,376 +1040,239 @@ class DrawingEvaluator:
 
     def _count_tool_changes(self, actions):
         """Count number of tool changes"""
-        tool_clicks = 0
-        # Load tool coordinates from config
-        tool_coords = list(self.tool_positions.values())
-
-        for i, action in enumerate(actions):
-            if action.get("action") == "click":
-                x, y = action.get("x", 0), action.get("y", 0)
-                # Check if click is near any tool button
-                for tx, ty in tool_coords:
-                    if abs(x - tx) < 40 and abs(y - ty) < 40:
-                        tool_clicks += 1
-                        break
-            # Also check moveTo + click pattern (implicit click)
-            elif action.get("action") == "moveTo" and i + 1 < len(actions):
-                if actions[i + 1].get("action") == "click":
-                    x, y = action.get("x", 0), action.get("y", 0)
-                    for tx, ty in tool_coords:
-                        if abs(x - tx) < 40 and abs(y - ty) < 40:
-                            # Don't count here, will be counted by click itself
-                            break
-
-        return tool_clicks
+        return self._single_pass_stats(actions)["tool_clicks"]
 
     def _count_color_changes(self, actions):
         """Count number of color changes"""
-        color_clicks = 0
-        color_y = 25
-        color_x_range = (405, 741)
-
-        for action in actions:
-            if action.get("action") == "click":
-                x, y = action.get("x", 0), action.get("y", 0)
-                if (color_x_range[0] <= x <= color_x_range[1] and
-                    abs(y - color_y) < 20):
-                    color_clicks += 1
-
-        return color_clicks
+        return self._single_pass_stats(actions)["color_clicks"]
 
-    def _detect_exact_colors_used(self, actions):
+    def _detect_exact_colors_used(self, actions, kinds=None, columns=None):
         """
         ENHANCED: Detect which exact colors were selected
+        columns: precomputed ActionArray, if any
         Returns: List of color hex codes in order of selection
         """
-        colors_used = []
-        color_tolerance_x = 12
-        color_tolerance_y = 8  # Tighter Y tolerance since all color buttons at same Y
+        if columns is None:
+            columns = self._action_array(actions, kinds)
+        kinds = columns.kinds
 
-        for i, action in enumerate(actions):
-            # Check both click and moveTo+click patterns
-            if action.get("action") == "click":
-                x = action.get("x", 0)
-                y = action.get("y", 0)
-
-                # Find matching color
-                for cx, cy, color in self.color_positions:
-                    if (abs(x - cx) <= color_tolerance_x and
-                        abs(y - cy) <= color_tolerance_y):
-                        colors_used.append(color)
-                        break
-
-            # Check moveTo followed by click (without coordinates)
-            elif action.get("action") == "moveTo":
-                if i + 1 < len(actions) and actions[i + 1].get("action") == "click":
-                    x = action.get("x", 0)
-                    y = action.get("y", 0)
-
-                    for cx, cy, color in self.color_positions:
-                        if (abs(x - cx) <= color_tolerance_x and
-                            abs(y - cy) <= color_tolerance_y):
-                            colors_used.append(color)
-                            break
-
-        return colors_used
-
-    def _estimate_canvas_coverage_accurate(self, actions):
+        # Check both click and moveTo+click patterns
+        clicks = kinds == _CLICK
+        next_is_click = np.zeros(len(kinds), dtype=bool)
+        next_is_click[:-1] = clicks[1:]
+        candidates = clicks | ((kinds == _MOVE_TO) & next_is_click)
+
+        # Color button under each candidate, if any
+        idx = columns.colors[candidates]
+        return [self._color_hex[j] for j in idx[idx >= 0]]
+
+    def _estimate_canvas_coverage_accurate(self, actions, kinds=None, columns=None):
         """
         ENHANCED: More accurate coverage using density grid method with tool-specific handling
+        columns: precomputed ActionArray, if any
         """
-        grid_size = 20  # 20x20 grid = 400 cells
-        grid = np.zeros((grid_size, grid_size), dtype=np.uint8)
-
-        is_drawing = False
-        current_tool = "pen"  # Default tool
-        mouse_down_pos = None
-        last_pos = (0, 0)  # Track last known position
-
-        for i, action in enumerate(actions):
-            # Update last position if action has coordinates
-            if "x" in action and "y" in action:
-                last_pos = (action.get("x"), action.get("y"))
-
-            # Track tool selection
-            if action.get("action") == "click" and "x" in action and "y" in action:
-                x, y = action.get("x"), action.get("y")
-                for tool_name, (tx, ty) in self.tool_positions.items():
-                    if abs(x - tx) < 40 and abs(y - ty) < 40:
-                        current_tool = tool_name
-                        break
-            elif action.get("action") == "moveTo":
-                x, y = action.get("x", 0), action.get("y", 0)
-                for tool_name, (tx, ty) in self.tool_positions.items():
-                    if abs(x - tx) < 40 and abs(y - ty) < 40:
-                        if i + 1 < len(actions) and actions[i + 1].get("action") == "click":
-                            current_tool = tool_name
-                        break
-
-            if action.get("action") == "mouseDown":
-                is_drawing = True
-                # Use action coordinates if available, otherwise use last known position
-                if "x" in action and "y" in action:
-                    mouse_down_pos = (action.get("x"), action.get("y"))
-                else:
-                    mouse_down_pos = last_pos
-            elif action.get("action") == "mouseUp":
-                # Handle shape tools (rectangle, circle, line)
-                if is_drawing and mouse_down_pos and current_tool in ["rectangle", "circle", "line"]:
-                    # Use action coordinates if available, otherwise use last known position
-                    if "x" in action and "y" in action:
-                        mouse_up_pos = (action.get("x"), action.get("y"))
-                    else:
-                        mouse_up_pos = last_pos
-                    self._fill_shape_in_grid(grid, grid_size, current_tool, mouse_down_pos, mouse_up_pos)
-                is_drawing = False
-                mouse_down_pos = None
-
-            # For pen/eraser, track movement while drawing
-            if is_drawing and current_tool in ["pen", "eraser"] and "x" in action and "y" in action:
-                canvas_x = action["x"] - self.canvas_offset_x
-                canvas_y = action["y"] - self.canvas_offset_y
-
-                if (0 <= canvas_x <= self.canvas_width and
-                    0 <= canvas_y <= self.canvas_height):
-
-                    grid_x = int((canvas_x / self.canvas_width) * grid_size)
-                    grid_y = int((canvas_y / self.canvas_height) * grid_size)
-                    grid_x = min(grid_x, grid_size - 1)
-                    grid_y = min(grid_y, grid_size - 1)
-                    grid[grid_y, grid_x] = 1
-
-        filled_cells = np.sum(grid)
-        total_cells = grid_size * grid_size
-        coverage = filled_cells / total_cells
-        return round(coverage, 4)
+        grid = self._scratch().grid_buf
+        grid.fill(0)
+
+        grid_size = grid.shape[0]
+
+        if columns is None:
+            columns = self._action_array(actions, kinds)
+        xs = columns.xs
+        ys = columns.ys
+
+        freehand = np.zeros(len(xs), dtype=np.bool_)
+        _coverage_kernel(
+            xs, ys, columns.kinds, self._tool_xy, self._tool_ids,
+            float(self.canvas_offset_x), float(self.canvas_offset_y),
+            float(self.canvas_width), float(self.canvas_height), grid, freehand
+        )
+
+        # Bin pen/eraser points that landed on the canvas
+        points = freehand & columns.on_canvas
+        canvas_x = xs[points] - self.canvas_offset_x
+        canvas_y = ys[points] - self.canvas_offset_y
+        grid_x = np.clip(((canvas_x / self.canvas_width) * grid_size).astype(np.int32), 0, grid_size - 1)
+        grid_y = np.clip(((canvas_y / self.canvas_height) * grid_size).astype(np.int32), 0, grid_size - 1)
+        occupied = np.bincount(grid_y * grid_size + grid_x, minlength=grid_size * grid_size).astype(bool)
+        occupied |= grid.ravel().astype(bool)
+
+        return round(occupied.mean(), COVERAGE_DECIMALS)
 
     def _fill_shape_in_grid(self, grid, grid_size, tool, start_pos, end_pos):
         """Fill grid cells for shape tools (rectangle, circle, line)"""
+        if tool not in SHAPE_TOOL_IDS:
+            return
+
         x1, y1 = start_pos
         x2, y2 = end_pos
 
         # Convert to canvas coordinates
-        cx1 = x1 - self.canvas_offset_x
-        cy1 = y1 - self.canvas_offset_y
-        cx2 = x2 - self.canvas_offset_x
-        cy2 = y2 - self.canvas_offset_y
-
-        if tool == "rectangle":
-            # Fill all cells in rectangle area
-            min_x = min(cx1, cx2)
-            max_x = max(cx1, cx2)
-            min_y = min(cy1, cy2)
-            max_y = max(cy1, cy2)
-
-            # Convert pixel coordinates to grid cell coordinates
-            min_gx = max(0, int((min_x / self.canvas_width) * grid_size))
-            max_gx = min(grid_size - 1, int((max_x / self.canvas_width) * grid_size))
-            min_gy = max(0, int((min_y / self.canvas_height) * grid_size))
-            max_gy = min(grid_size - 1, int((max_y / self.canvas_height) * grid_size))
-
-            # Fill all grid cells within the rectangle bounds
-            for gx in range(min_gx, max_gx + 1):
-                for gy in range(min_gy, max_gy + 1):
-                    grid[gy, gx] = 1
-
-        elif tool == "circle":
-            # Calculate radius and fill circular area
-            radius = np.sqrt((cx2 - cx1)**2 + (cy2 - cy1)**2)
-            center_x, center_y = cx1, cy1
-
-            # Fill cells within circle
-            for angle in np.linspace(0, 2 * np.pi, 50):
-                for r in np.linspace(0, radius, int(radius / 20) + 1):
-                    x = center_x + r * np.cos(angle)
-                    y = center_y + r * np.sin(angle)
-                    if 0 <= x <= self.canvas_width and 0 <= y <= self.canvas_height:
-                        gx = int((x / self.canvas_width) * grid_size)
-                        gy = int((y / self.canvas_height) * grid_size)
-                        gx = min(gx, grid_size - 1)
-                        gy = min(gy, grid_size - 1)
-                        grid[gy, gx] = 1
-
-        elif tool == "line":
-            # Draw line with thickness
-            steps = int(max(abs(cx2 - cx1), abs(cy2 - cy1))) + 1
-            for i in range(steps):
-                t = i / max(steps - 1, 1)
-                x = cx1 + t * (cx2 - cx1)
-                y = cy1 + t * (cy2 - cy1)
-                if 0 <= x <= self.canvas_width and 0 <= y <= self.canvas_height:
-                    gx = int((x / self.canvas_width) * grid_size)
-                    gy = int((y / self.canvas_height) * grid_size)
-                    gx = min(gx, grid_size - 1)
-                    gy = min(gy, grid_size - 1)
-                    grid[gy, gx] = 1
-
-    def _verify_tool_actually_used(self, actions, tool):
+        _fill_shape_jit(
+            grid, grid_size, SHAPE_TOOL_IDS[tool],
+            float(x1 - self.canvas_offset_x), float(y1 - self.canvas_offset_y),
+            float(x2 - self.canvas_offset_x), float(y2 - self.canvas_offset_y),
+            float(self.canvas_width), float(self.canvas_height)
+        )
+
+    def _verify_tool_actually_used(self, actions, tool, columns=None):
         """
         ENHANCED: Verify that tool was not just selected but actually used
+        columns: precomputed ActionArray, if any
         Returns: (was_selected, was_used)
         """
         if tool not in self.tool_positions:
             return False, False
 
-        tx, ty = self.tool_positions[tool]
-        tool_selected_idx = None
+        if columns is None:
+            columns = self._action_array(actions)
+        xs, ys, kinds = columns.pointer_xs, columns.pointer_ys, columns.kinds
+        tool_idx = self._tool_names.index(tool)
 
         # Find where tool was selected
-        for i, action in enumerate(actions):
-            # Pattern 1: moveTo + click
-            if action.get("action") == "moveTo":
-                x, y = action.get("x", 0), action.get("y", 0)
-                if abs(x - tx) < 40 and abs(y - ty) < 40:
-                    if i + 1 < len(actions) and actions[i + 1].get("action") == "click":
-                        tool_selected_idx = i + 1
-                        break
-            # Pattern 2: click with coordinates
-            elif action.get("action") == "click" and "x" in action:
-                x, y = action.get("x", 0), action.get("y", 0)
-                if abs(x - tx) < 40 and abs(y - ty) < 40:
-                    tool_selected_idx = i
-                    break
-
-        if tool_selected_idx is None:
+        selections = self._find_tool_selections(columns, tool_idx)
+        if len(selections) == 0:
             return False, False
 
+        first = int(selections[0])
+        # Pattern 1 (moveTo + click) selects on the click that follows
+        tool_selected_idx = first + 1 if kinds[first] == _MOVE_TO else first
+
         # Check if tool was actually used (drawing action after selection)
-        for i in range(tool_selected_idx + 1, len(actions)):
-            action = actions[i]
+        rest = slice(tool_selected_idx + 1, None)
+        other_xy = np.delete(self._tool_xy, tool_idx, axis=0)
+        # If another tool is selected before drawing, tool wasn't used
+        other_selected, _ = self._match_buttons(xs[rest], ys[rest], other_xy, 40, 40, strict=True)
+        other_selected &= (kinds[rest] == _MOVE_TO) | (kinds[rest] == _CLICK)
+        # If we find a drawing action, tool was used
+        drawing = kinds[rest] == _MOUSE_DOWN
+
+        stops = np.flatnonzero(drawing | other_selected)
+        if len(stops) and drawing[stops[0]]:
+            return True, True
+
+        # Selected but not used, or tool selected but no drawing found
+        return True, False
 
-            # If we find a drawing action, tool was used
-            if action.get("action") == "mouseDown":
-                return True, True
+    def _find_tool_selections(self, columns, tool_idx):
+        """Indices where a tool is selected via moveTo + click or a click with coordinates"""
+        near, _ = self._match_buttons(
+            columns.pointer_xs, columns.pointer_ys,
+            self._tool_xy[tool_idx:tool_idx + 1], 40, 40, strict=True
+        )
 
-            # If another tool is selected before drawing, tool wasn't used
-            if action.get("action") in ["moveTo", "click"]:
-                x, y = action.get("x", 0), action.get("y", 0)
-                # Check if this is selecting another tool
-                for other_tool, (otx, oty) in self.tool_positions.items():
-                    if other_tool != tool and abs(x - otx) < 40 and abs(y - oty) < 40:
-                        return True, False  # Selected but not used
+        kinds = columns.kinds
+        clicks = kinds == _CLICK
+        next_is_click = np.zeros(len(kinds), dtype=bool)
+        next_is_click[:-1] = clicks[1:]
 
-        # Tool selected but no drawing found
-        return True, False
+        # Pattern 1: moveTo tool position, then click
+        # Pattern 2: click with coordinates
+        return np.flatnonzero(near & (((kinds == _MOVE_TO) & next_is_click) | (clicks & columns.has_x)))
 
     def _count_drawing_segments(self, actions):
         """Count number of continuous drawing segments"""
-        segments = 0
-        in_segment = False
-
-        for action in actions:
-            if action.get("action") == "mouseDown":
-                if not in_segment:
-                    segments += 1
-                    in_segment = True
-            elif action.get("action") == "mouseUp":
-                in_segment = False
+        return self._single_pass_stats(actions)["segments"]
 
-        return segments
+    def _estimate_canvas_coverage(self, actions, kinds=None, columns=None):
+        """Estimate how much of the canvas is covered (columns: precomputed ActionArray, if any)"""
+        if columns is None:
+            columns = self._action_array(actions, kinds)
 
-    def _estimate_canvas_coverage(self, actions):
-        """Estimate how much of the canvas is covered"""
         # Collect all drawing positions
-        positions = []
-        is_drawing = False
-
-        for action in actions:
-            if action.get("action") == "mouseDown":
-                is_drawing = True
-            elif action.get("action") == "mouseUp":
-                is_drawing = False
-
-            if is_drawing and "x" in action and "y" in action:
-                canvas_x = action["x"] - self.canvas_offset_x
-                canvas_y = action["y"] - self.canvas_offset_y
-
-                if (0 <= canvas_x <= self.canvas_width and
-                    0 <= canvas_y <= self.canvas_height):
-                    positions.append((canvas_x, canvas_y))
-
-        if not positions:
+        points = columns.is_drawing & columns.on_canvas
+        if not points.any():
             return 0.0
 
         # Calculate bounding box
-        xs = [p[0] for p in positions]
-        ys = [p[1] for p in positions]
-
-        bbox_area = (max(xs) - min(xs)) * (max(ys) - min(ys))
+        canvas_x = columns.xs[points] - self.canvas_offset_x
+        canvas_y = columns.ys[points] - self.canvas_offset_y
+        bbox_area = float(np.ptp(canvas_x) * np.ptp(canvas_y))
         canvas_area = self.canvas_width * self.canvas_height
 
         coverage = bbox_area / canvas_area
-        return round(coverage, 4)
+        return round(coverage, COVERAGE_DECIMALS)
 
-    def _check_criteria(self, actions, criteria):
-        """Check if specific criteria are met"""
+    def _check_criteria(self, actions, criteria, stats=None, metrics=None, used_color_keys=None, columns=None):
+        """
+        Check if specific criteria are met
+        metrics / used_color_keys / columns: precomputed evaluate() metrics,
+        canonical exact colors and ActionArray, if any
+        """
         results = {}
+        if stats is None:
+            stats = self._single_pass_stats(actions)
 
         # Check required tools
         if "required_tools" in criteria:
+            if columns is None:
+                columns = self._action_array(actions, stats["kinds"])
             for tool in criteria["required_tools"]:
                 tool_used = False
                 if tool in self.tool_positions:
-                    tx, ty = self.tool_positions[tool]
                     # Check for moveTo + click pattern OR direct click
-                    for i, action in enumerate(actions):
-                        # Pattern 1: moveTo tool position, then click
-                        if action.get("action") == "moveTo":
-                            x, y = action.get("x", 0), action.get("y", 0)
-                            if abs(x - tx) < 40 and abs(y - ty) < 40:
-                                # Check if next action is click
-                                if i + 1 < len(actions) and actions[i + 1].get("action") == "click":
-                                    tool_used = True
-                                    break
-                        # Pattern 2: click with coordinates
-                        elif action.get("action") == "click" and "x" in action:
-                            x, y = action.get("x", 0), action.get("y", 0)
-                            if abs(x - tx) < 40 and abs(y - ty) < 40:
-                                tool_used = True
-                                break
+                    selections = self._find_tool_selections(columns, self._tool_names.index(tool))
+                    tool_used = len(selections) > 0
 
                 results[f"tool_{tool}_used"] = tool_used
 
                 # ENHANCED: Tool usage verification
-                was_selected, was_used = self._verify_tool_actually_used(actions, tool)
+                was_selected, was_used = self._verify_tool_actually_used(actions, tool, columns)
                 results[f"tool_{tool}_selected"] = was_selected
                 results[f"tool_{tool}_actually_used"] = was_used
 
         # Check minimum drawing segments
         if "min_segments" in criteria:
-            actual_segments = self._count_drawing_segments(actions)
+            actual_segments = stats["segments"]
             results["min_segments_met"] = bool(actual_segments >= criteria["min_segments"])
             results["actual_segments"] = actual_segments
 
         # Check color usage
         if "required_colors" in criteria:
             # Old method: count clicks
-            color_clicks = self._count_color_changes(actions)
+            color_clicks = stats["color_clicks"]
             results["colors_changed"] = color_clicks
             results["min_colors_met"] = bool(color_clicks >= len(criteria["required_colors"]))
 
             # ENHANCED: Exact color detection
-            exact_colors = self._detect_exact_colors_used(actions)
-            required = set(criteria["required_colors"])
-            used = set(exact_colors)
-
-            matched_colors = required & used
-            missing_colors = required - used
-
-            results["colors_exact_used"] = list(used)
+            if metrics is not None:
+                exact_colors = metrics["exact_colors_used"]
+            else:
+                exact_colors = self._detect_exact_colors_used(actions, stats["kinds"], columns)
+            # Compare hex codes case-insensitively (see _color_key), but
+            # report them as given
+            required = frozenset(_color_key(color) for color in criteria["required_colors"])
+            if used_color_keys is None:
+                used_color_keys = frozenset(_color_key(color) for color in exact_colors)
+
+            matched_colors = required & used_color_keys
+            # Missing colors in criteria order, one entry per canonical color
+            missing_colors = {}
+            for color in criteria["required_colors"]:
+                key = _color_key(color)
+                if key not in used_color_keys:
+                    missing_colors[key] = color
+
+            results["colors_exact_used"] = list(set(exact_colors))
             results["colors_matched"] = len(matched_colors)
-            results["colors_missing"] = list(missing_colors)
+            results["colors_missing"] = list(missing_colors.values())
             results["min_colors_exact_met"] = bool(len(matched_colors) >= len(required))
 
         # Check canvas coverage
         if "min_coverage" in criteria:
             # Old method: bounding box
-            coverage = self._estimate_canvas_coverage(actions)
+            if metrics is not None:
+                coverage = metrics["canvas_coverage"]
+            else:
+                coverage = self._estimate_canvas_coverage(actions)
             results["canvas_coverage"] = coverage
             results["min_coverage_met"] = bool(coverage >= criteria["min_coverage"])
 
             # ENHANCED: Accurate grid-based coverage
-            accurate_coverage = self._estimate_canvas_coverage_accurate(actions)
+            if metrics is not None:
+                accurate_coverage = metrics["canvas_coverage_accurate"]
+            else:
+                accurate_coverage = self._estimate_canvas_coverage_accurate(actions)
             results["canvas_coverage_accurate"] = accurate_coverage
             results["min_coverage_accurate_met"] = bool(accurate_coverage >= criteria["min_coverage"])
 
@@ -739,64 +1282,67 @@ class DrawingEvaluator:
         """Calculate overall score (0-1) with strict criteria penalties"""
         score = 1.0
         criteria_met = results.get('criteria_met', {})
+        metrics = results['metrics']
 
         # STRICT PENALTIES FOR CRITERIA VIOLATIONS
+        # (which checks apply depends only on the criteria, see _compile_scoring_plan)
+        for op in _compile_scoring_plan(tuple(criteria_met)):
+            kind = op[0]
+
+            if kind == 'tool_penalty':
+                # ENHANCED: Tool penalties based on actual usage
+                _, keys, penalty = op
+                tool_penalties = 0
+                for key in keys:
+                    if not criteria_met[key]:
+                        tool_penalties += penalty
+                score -= tool_penalties
+
+            elif kind == 'exact_color_penalty':
+                # ENHANCED: Exact color matching penalty
+                if not criteria_met['min_colors_exact_met']:
+                    colors_required = results.get('colors_required', 0)
+                    colors_matched = criteria_met.get('colors_matched', 0)
+                    missing_colors = max(0, colors_required - colors_matched)
+                    score -= op[1] * missing_colors
+
+            elif kind == 'color_penalty':
+                # Fallback to old method if exact matching not available
+                if not criteria_met['min_colors_met']:
+                    colors_required = results.get('colors_required', 0)
+                    colors_used = criteria_met.get('colors_changed', 0)
+                    missing_colors = max(0, colors_required - colors_used)
+                    score -= op[1] * missing_colors
+
+            elif kind == 'segment_penalty':
+                # Insufficient drawing segments
+                if not criteria_met['min_segments_met']:
+                    score -= op[1]
+
+            elif kind == 'proportional_coverage':
+                # ENHANCED: Proportional coverage penalty based on deficit
+                if not criteria_met['min_coverage_accurate_met']:
+                    # Get actual coverage and required coverage
+                    actual_coverage = metrics.get('canvas_coverage_accurate', 0)
+                    required_coverage = results.get('min_coverage', 0)
 
-        # ENHANCED: Tool penalties based on actual usage
-        tool_penalties = 0
-        for key, value in criteria_met.items():
-            # Prefer "actually_used" over just "used"
-            if key.endswith('_actually_used'):
-                if not value:
-                    tool_penalties += 0.15  # Reduced from 0.20 to prevent score saturation
-            elif key.startswith('tool_') and key.endswith('_used'):
-                # Only penalize if there's no "actually_used" check
-                tool_name = key.replace('tool_', '').replace('_used', '')
-                if f'tool_{tool_name}_actually_used' not in criteria_met:
-                    if not value:
-                        tool_penalties += 0.15  # Reduced from 0.20 to prevent score saturation
-        score -= tool_penalties
-
-        # ENHANCED: Exact color matching penalty
-        if criteria_met.get('min_colors_exact_met') is not None:
-            # Use exact color matching if available
-            if not criteria_met.get('min_colors_exact_met', True):
-                colors_required = results.get('colors_required', 0)
-                colors_matched = criteria_met.get('colors_matched', 0)
-                missing_colors = max(0, colors_required - colors_matched)
-                score -= 0.05 * missing_colors  # Reduced from 0.08 to prevent score saturation
-        else:
-            # Fallback to old method if exact matching not available
-            if not criteria_met.get('min_colors_met', True):
-                colors_required = results.get('colors_required', 0)
-                colors_used = criteria_met.get('colors_changed', 0)
-                missing_colors = max(0, colors_required - colors_used)
-                score -= 0.05 * missing_colors  # Reduced from 0.08 to prevent score saturation
-
-        # Insufficient drawing segments: -0.15
-        if not criteria_met.get('min_segments_met', True):
-            score -= 0.15
-
-        # ENHANCED: Proportional coverage penalty based on deficit
-        if criteria_met.get('min_coverage_accurate_met') is not None:
-            if not criteria_met.get('min_coverage_accurate_met', True):
-                # Get actual coverage and required coverage
-                actual_coverage = results['metrics'].get('canvas_coverage_accurate', 0)
-                required_coverage = results.get('min_coverage', 0)
-
-                if required_coverage > 0:
-                    # Calculate deficit ratio (how far below requirement)
-                    deficit = max(0, required_coverage - actual_coverage)
-                    deficit_ratio = deficit / required_coverage
-                    # Proportional penalty: full 0.12 if 0% coverage, scales down as coverage increases
-                    score -= deficit_ratio * 0.12
-                else:
                     # No requirement, no penalty
-                    pass
-        else:
-            # Fallback to old method (binary)
-            if not criteria_met.get('min_coverage_met', True):
-                score -= 0.12
+                    if required_coverage > 0:
+                        # Calculate deficit ratio (how far below requirement)
+                        deficit = max(0, required_coverage - actual_coverage)
+                        deficit_ratio = deficit / required_coverage
+                        # Proportional penalty: full penalty if 0% coverage, scales down as coverage increases
+                        score -= deficit_ratio * op[1]
+
+            elif kind == 'coverage_penalty':
+                # Fallback to old method (binary)
+                if not criteria_met['min_coverage_met']:
+                    score -= op[1]
+
+            # Penalties only lower the score and the bonus needs >= 0.2,
+            # so once at the floor the result is settled
+            if score <= 0.0:
+                return 0.0
 
         # Errors and warnings
         error_penalty = len(results["errors"]) * 0.08
@@ -804,6 +1350,8 @@ class DrawingEvaluator:
 
         score -= error_penalty
         score -= warning_penalty
+        if score <= 0.0:
+            return 0.0
 
         # Small bonus for reasonable action count (only if some criteria met)
         action_count = results["total_actions"]
@@ -818,92 +1366,54 @@ class DrawingEvaluator:
         if not prompt:
             return {}
 
-        prompt_lower = prompt.lower()
         constraints = {}
 
         # Detect region constraints
-        if 'top-left' in prompt_lower or 'upper-left' in prompt_lower or 'top left' in prompt_lower:
-            constraints['region'] = 'top-left'
-        elif 'top-right' in prompt_lower or 'upper-right' in prompt_lower or 'top right' in prompt_lower:
-            constraints['region'] = 'top-right'
-        elif 'bottom-left' in prompt_lower or 'lower-left' in prompt_lower or 'bottom left' in prompt_lower:
-            constraints['region'] = 'bottom-left'
-        elif 'bottom-right' in prompt_lower or 'lower-right' in prompt_lower or 'bottom right' in prompt_lower:
-            constraints['region'] = 'bottom-right'
-        elif 'center' in prompt_lower or 'middle' in prompt_lower or 'centre' in prompt_lower:
-            constraints['region'] = 'center'
-        elif 'top' in prompt_lower or 'upper' in prompt_lower:
-            constraints['region'] = 'top'
-        elif 'bottom' in prompt_lower or 'lower' in prompt_lower:
-            constraints['region'] = 'bottom'
-        elif 'left' in prompt_lower:
-            constraints['region'] = 'left'
-        elif 'right' in prompt_lower:
-            constraints['region'] = 'right'
+        region = _extract_region(prompt.lower())
+        if region is not None:
+            constraints['region'] = region
 
         return constraints
 
-    def _calculate_drawing_centroid(self, actions):
-        """Calculate centroid of all drawing points"""
-        drawing_points = []
-        is_drawing = False
-        current_pos = None
-
-        for action in actions:
-            action_type = action.get('action', '')
-            x = action.get('x')
-            y = action.get('y')
-
-            if action_type == 'moveTo' and x is not None and y is not None:
-                current_pos = (x, y)
-
-            elif action_type == 'mouseDown' and current_pos:
-                is_drawing = True
-                # Check if on canvas
-                if (self.canvas_offset_x <= current_pos[0] < self.canvas_offset_x + self.canvas_width and
-                    self.canvas_offset_y <= current_pos[1] < self.canvas_offset_y + self.canvas_height):
-                    drawing_points.append(current_pos)
-
-            elif action_type == 'mouseUp':
-                is_drawing = False
-
-            elif is_drawing and action_type == 'moveTo' and x is not None and y is not None:
-                # Drawing in progress, add point
-                if (self.canvas_offset_x <= x < self.canvas_offset_x + self.canvas_width and
-                    self.canvas_offset_y <= y < self.canvas_offset_y + self.canvas_height):
-                    drawing_points.append((x, y))
-
-        if not drawing_points:
+    def _calculate_drawing_centroid(self, actions, kinds=None, columns=None):
+        """
+        Calculate centroid of all drawing points
+        A drawing point is the pen position (last moveTo with x/y) at each
+        mouseDown that lands on the canvas
+        """
+        if not actions:
             return None
 
-        # Calculate centroid
-        avg_x = sum(p[0] for p in drawing_points) / len(drawing_points)
-        avg_y = sum(p[1] for p in drawing_points) / len(drawing_points)
-
-        # Convert to canvas-relative coordinates
-        rel_x = avg_x - self.canvas_offset_x
-        rel_y = avg_y - self.canvas_offset_y
-
-        return (rel_x, rel_y)
-
-    def _evaluate_spatial_accuracy(self, actions, constraints):
-        """Evaluate spatial accuracy against constraints"""
-        if not constraints or 'region' not in constraints:
+        if columns is None:
+            columns = self._action_array(actions, kinds)
+
+        kinds, xs, ys, has_xy = columns.kinds, columns.xs, columns.ys, columns.has_xy
+        if not HAVE_NUMBA:
+            # The plain-Python kernel switches on small ints far faster than on NumPy scalars
+            kinds, xs, ys, has_xy = kinds.tolist(), xs.tolist(), ys.tolist(), has_xy.tolist()
+
+        x_lo = self.canvas_offset_x
+        y_lo = self.canvas_offset_y
+        sum_x, sum_y, count = _centroid_kernel(
+            kinds, xs, ys, has_xy,
+            float(x_lo), float(y_lo), float(self._cx_hi), float(self._cy_hi)
+        )
+        if count == 0:
             return None
 
-        centroid = self._calculate_drawing_centroid(actions)
-        if centroid is None:
-            return 0.0  # No drawing, no accuracy
+        # Calculate centroid and convert to canvas-relative coordinates
+        rel_x = sum_x / count - x_lo
+        rel_y = sum_y / count - y_lo
 
-        cx, cy = centroid
-        region = constraints['region']
+        return (rel_x, rel_y)
 
-        # Define region boundaries (canvas-relative)
+    def _build_region_centers(self):
+        """Centers of the canvas regions (canvas-relative)"""
         # Divide canvas into 3x3 grid for regions
         third_w = self.canvas_width / 3
         third_h = self.canvas_height / 3
 
-        region_centers = {
+        return {
             'top-left': (third_w / 2, third_h / 2),
             'top': (self.canvas_width / 2, third_h / 2),
             'top-right': (self.canvas_width - third_w / 2, third_h / 2),
@@ -915,19 +1425,30 @@ class DrawingEvaluator:
             'bottom-right': (self.canvas_width - third_w / 2, self.canvas_height - third_h / 2)
         }
 
-        if region not in region_centers:
+    def _evaluate_spatial_accuracy(self, actions, constraints, kinds=None, columns=None):
+        """Evaluate spatial accuracy against constraints"""
+        if not constraints or 'region' not in constraints:
             return None
 
-        target_x, target_y = region_centers[region]
+        centroid = self._calculate_drawing_centroid(actions, kinds, columns)
+        if centroid is None:
+            return 0.0  # No drawing, no accuracy
+
+        cx, cy = centroid
+        region = constraints['region']
+
+        target = self._region_centers.get(region)
+        if target is None:
+            return None
 
-        # Calculate distance from centroid to region center
-        distance = ((cx - target_x) ** 2 + (cy - target_y) ** 2) ** 0.5
+        target_x, target_y = target
 
-        # Maximum possible distance (canvas diagonal)
-        max_distance = (self.canvas_width ** 2 + self.canvas_height ** 2) ** 0.5
+        # Calculate distance from centroid to region center (a single sqrt;
+        # the reported scale is linear, see SPATIAL_ACCURACY_THRESHOLD)
+        distance = math.hypot(cx - target_x, cy - target_y)
 
         # Normalize to [0, 1] - higher is better
-        spatial_accuracy = max(0.0, 1.0 - (distance / max_distance))
+        spatial_accuracy = max(0.0, 1.0 - (distance / self._max_distance))
 
         return spatial_accuracy
 
@@ -973,8 +1494,11 @@ class DrawingEvaluator:
 
         return round(efficiency, 3)
 
-    def _classify_errors(self, results, criteria):
-        """Classify errors into categories for detailed analysis"""
+    def _classify_errors(self, results, criteria, used_color_keys=None):
+        """
+        Classify errors into categories for detailed analysis
+        used_color_keys: precomputed canonical exact colors, if any
+        """
         error_classification = {
             'spatial_errors': [],
             'tool_errors': [],
@@ -988,9 +1512,9 @@ class DrawingEvaluator:
 
         # Tool errors
         criteria_met = results.get('criteria_met', {})
-        for key in criteria_met:
-            if key.endswith('_actually_used') and not criteria_met[key]:
-                tool_name = key.replace('tool_', '').replace('_actually_used', '')
+        metrics = results['metrics']
+        for key, tool_name in _actually_used_checks(tuple(criteria_met)):
+            if not criteria_met[key]:
                 error_classification['tool_errors'].append({
                     'type': 'missing_required_tool',
                     'tool': tool_name
@@ -998,9 +1522,12 @@ class DrawingEvaluator:
 
         # Color errors
         if 'required_colors' in criteria:
-            exact_colors_used = results['metrics'].get('exact_colors_used', [])
+            if used_color_keys is None:
+                used_color_keys = frozenset(
+                    _color_key(color) for color in metrics.get('exact_colors_used', ())
+                )
             for color in criteria['required_colors']:
-                if color not in exact_colors_used:
+                if _color_key(color) not in used_color_keys:
                     error_classification['color_errors'].append({
                         'type': 'missing_required_color',
                         'color': color
@@ -1008,7 +1535,7 @@ class DrawingEvaluator:
 
         # Coverage errors (spatial)
         if 'min_coverage' in criteria:
-            actual_coverage = results['metrics'].get('canvas_coverage_accurate', 0)
+            actual_coverage = metrics.get('canvas_coverage_accurate', 0)
             required_coverage = criteria['min_coverage']
             if actual_coverage < required_coverage:
                 error_classification['spatial_errors'].append({
@@ -1020,7 +1547,7 @@ class DrawingEvaluator:
 
         # Segments errors (planning)
         if 'min_segments' in criteria:
-            actual_segments = results['metrics'].get('drawing_segments', 0)
+            actual_segments = metrics.get('drawing_segments', 0)
             required_segments = criteria['min_segments']
             if actual_segments < required_segments:
                 error_classification['planning_errors'].append({
@@ -1031,9 +1558,9 @@ class DrawingEvaluator:
                 })
 
         # Spatial accuracy errors
-        spatial_accuracy = results['metrics'].get('spatial_accuracy')
-        if spatial_accuracy is not None and spatial_accuracy < 0.7:
-            spatial_constraints = results['metrics'].get('spatial_constraints', {})
+        spatial_accuracy = metrics.get('spatial_accuracy')
+        if spatial_accuracy is not None and spatial_accuracy < SPATIAL_ACCURACY_THRESHOLD:
+            spatial_constraints = metrics.get('spatial_constraints', {})
             error_classification['spatial_errors'].append({
                 'type': 'incorrect_spatial_placement',
                 'accuracy': spatial_accuracy,
@@ -1041,57 +1568,61 @@ class DrawingEvaluator:
             })
 
         # Syntax errors from evaluator
-        for error in results.get('errors', []):
-            error_classification['syntax_errors'].append(error)
+        error_classification['syntax_errors'].extend(results.get('errors', []))
 
         return error_classification
 
     def generate_feedback(self, evaluation_results):
         """Generate human-readable feedback from evaluation results"""
-        feedback = []
+        buf = StringIO()
+        write = buf.write
+        metrics = evaluation_results['metrics']
 
         # Report errors
         if evaluation_results["errors"]:
-            feedback.append("ERRORS FOUND:")
-            for error in evaluation_results["errors"][:5]:  # Show first 5
-                feedback.append(f"  - [{error['type']}] {error['message']}")
+            write("ERRORS FOUND:\n")
+            buf.writelines(  # Show first 5
+                f"  - [{error['type']}] {error['message']}\n" for error in evaluation_results["errors"][:5]
+            )
 
         # Report warnings
         if evaluation_results["warnings"]:
-            feedback.append("\nWARNINGS:")
-            for warning in evaluation_results["warnings"][:3]:
-                feedback.append(f"  - [{warning['type']}] {warning['message']}")
+            write("\nWARNINGS:\n")
+            buf.writelines(
+                f"  - [{warning['type']}] {warning['message']}\n" for warning in evaluation_results["warnings"][:3]
+            )
 
         # Report metrics
-        feedback.append("\nMETRICS:")
-        feedback.append(f"  - Total actions: {evaluation_results['total_actions']}")
-        feedback.append(f"  - Tool changes: {evaluation_results['metrics']['tool_changes']}")
-        feedback.append(f"  - Color changes: {evaluation_results['metrics']['color_changes']}")
-        feedback.append(f"  - Drawing segments: {evaluation_results['metrics']['drawing_segments']}")
-        feedback.append(f"  - Canvas coverage: {evaluation_results['metrics']['canvas_coverage']:.2%}")
+        write(
+            "\nMETRICS:\n"
+            f"  - Total actions: {evaluation_results['total_actions']}\n"
+            f"  - Tool changes: {metrics['tool_changes']}\n"
+            f"  - Color changes: {metrics['color_changes']}\n"
+            f"  - Drawing segments: {metrics['drawing_segments']}\n"
+            f"  - Canvas coverage: {metrics['canvas_coverage']:.2%}\n"
+        )
 
         # Report criteria
         if "criteria_met" in evaluation_results:
-            feedback.append("\nCRITERIA:")
-            for key, value in evaluation_results["criteria_met"].items():
-                status = "PASS" if value else "FAIL"
-                feedback.append(f"  - {key}: {status}")
+            write("\nCRITERIA:\n")
+            buf.writelines(
+                f"  - {key}: {'PASS' if value else 'FAIL'}\n"
+                for key, value in evaluation_results["criteria_met"].items()
+            )
 
         # Overall score
-        feedback.append(f"\nOVERALL SCORE: {evaluation_results['score']:.2f}/1.00")
+        write(f"\nOVERALL SCORE: {evaluation_results['score']:.2f}/1.00")
 
-        return "\n".join(feedback)
+        return buf.getvalue()
 
 
 def evaluate_from_file(actions_file, criteria_file=None):
     """Evaluate actions from a JSON file"""
-    with open(actions_file, 'r') as f:
-        actions = json.load(f)
+    actions = _load_json(actions_file)
 
     criteria = None
     if criteria_file:
-        with open(criteria_file, 'r') as f:
-            criteria = json.load(f)
+        criteria = _load_json(criteria_file)
 
     evaluator = DrawingEvaluator()
     results = evaluator.evaluate(actions, criteria=criteria)
@@ -7,11 +7,72 @@ Runs complete benchmark on all models and generates comprehensive analysis
 import os
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from test_llm import run_batch_test, load_dataset
 
-def run_full_experiment():
-    """Run complete experiment on all models and prompts"""
+try:
+    import orjson
+except ImportError:  # orjson is optional, stdlib json is used instead
+    orjson = None
+
+def dumps_record(record):
+    """Serialize one result record as a UTF-8 JSON line (bytes)"""
+    if orjson is not None:
+        return orjson.dumps(
+            record,
+            option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+def dump_json(obj, path):
+    """Write obj as indented UTF-8 JSON, with orjson when it is installed"""
+    if orjson is not None:
+        data = orjson.dumps(
+            obj,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+        with open(path, 'wb') as f:
+            f.write(data)
+        return
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(obj, f, indent=2, ensure_ascii=False)
+
+def run_model(dataset, model):
+    """Run the batch test for one model and record its status and timing"""
+    model_start = time.time()
+    
+    try:
+        # Run batch test on all prompts
+        results = run_batch_test(
+            dataset=dataset,
+            model=model,
+            category=None,  # All categories
+            difficulty=None,  # All difficulties
+            limit=None  # All prompts
+        )
+        
+        return {
+            "status": "success",
+            "results": results,
+            "time_taken": time.time() - model_start
+        }
+        
+    except Exception as e:
+        return {
+            "status": "failed",
+            "error": str(e),
+            "time_taken": time.time() - model_start
+        }
+
+def run_full_experiment(max_workers=1):
+    """
+    Run complete experiment on all models and prompts
+    max_workers: models tested at once (default 1, one after another). Only
+    raise it if run_batch_test writes a separate results file per model and is
+    thread-safe - otherwise concurrent runs race on batch_results_all_all.json
+    """
     
     print("🚀 Starting Full Drawing Benchmark Experiment")
     print("="*80)
@@ -24,7 +85,7 @@ def run_full_experiment():
         "google/gemini-2.5-flash-thinking-off"
     ]
     
-    # Load dataset
+    # Load dataset (parsed once and shared by all model runs)
     dataset = load_dataset()
     total_prompts = len(dataset["prompts"])
     
@@ -32,46 +93,44 @@ def run_full_experiment():
     print(f"  Models: {len(models)}")
     print(f"  Prompts: {total_prompts}")
     print(f"  Total Tests: {len(models) * total_prompts}")
+    print(f"  Models in parallel: {max_workers}")
     print(f"  Estimated Time: ~1 hour")
     print()
     
-    # Track results
+    # Track results - full per-model results are streamed to disk as each
+    # model completes, only status and timing are kept in memory
     all_results = {}
     start_time = time.time()
+    # Microseconds keep back-to-back runs apart; 'xb' refuses to append to an existing file
+    run_id = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+    results_file = f"full_experiment_results_{run_id}.jsonl"
     
-    # Test each model
-    for i, model in enumerate(models, 1):
-        model_start = time.time()
-        print(f"🔬 Testing Model {i}/{len(models)}: {model}")
+    # Test models on a pool of max_workers threads - each run is bound by LLM latency
+    with ThreadPoolExecutor(max_workers=max_workers) as executor, open(results_file, 'xb') as stream:
+        futures = {}
+        for i, model in enumerate(models, 1):
+            print(f"🔬 Testing Model {i}/{len(models)}: {model}")
+            futures[executor.submit(run_model, dataset, model)] = model
         print("-" * 60)
         
-        try:
-            # Run batch test on all prompts
-            results = run_batch_test(
-                dataset=dataset,
-                model=model,
-                category=None,  # All categories
-                difficulty=None,  # All difficulties
-                limit=None  # All prompts
-            )
-            
-            all_results[model] = {
-                "status": "success",
-                "results": results,
-                "time_taken": time.time() - model_start
-            }
+        for future in as_completed(futures):
+            # Dropping the finished future lets its results be freed once written
+            model = futures.pop(future)
+            result = future.result()
             
-            print(f"✅ {model} completed in {time.time() - model_start:.1f} seconds")
+            # One line per model: {"model": ..., "status": ..., "results"/"error": ..., "time_taken": ...}
+            stream.write(dumps_record({"model": model, **result}))
+            stream.flush()
+            all_results[model] = {k: v for k, v in result.items() if k != "results"}
             
-        except Exception as e:
-            print(f"❌ {model} failed: {str(e)}")
-            all_results[model] = {
-                "status": "failed",
-                "error": str(e),
-                "time_taken": time.time() - model_start
-            }
-        
-        print()
+            if result["status"] == "success":
+                print(f"✅ {model} completed in {result['time_taken']:.1f} seconds")
+            else:
+                print(f"❌ {model} failed: {result['error']}")
+    
+    # Keep the summary in model order regardless of completion order
+    all_results = {model: all_results[model] for model in models}
+    print()
     
     # Calculate total time
     total_time = time.time() - start_time
@@ -84,20 +143,21 @@ def run_full_experiment():
         "models_tested": len(models),
         "prompts_tested": total_prompts,
         "total_tests": len(models) * total_prompts,
+        "results_file": results_file,
         "results": all_results
     }
     
-    # Save to file
-    output_file = f"full_experiment_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(experiment_results, f, indent=2, ensure_ascii=False)
+    # Save summary to file
+    output_file = f"full_experiment_results_{run_id}.json"
+    dump_json(experiment_results, output_file)
     
     # Print summary
     print("="*80)
     print("🎉 FULL EXPERIMENT COMPLETED")
     print("="*80)
     print(f"Total Time: {total_time/60:.1f} minutes")
-    print(f"Results saved to: {output_file}")
+    print(f"Results saved to: {results_file}")
+    print(f"Summary saved to: {output_file}")
     print()
     
     # Print model summary